@@ -1,13 +1,13 @@
+import sys
 from dataclasses import dataclass
+from operator import attrgetter
 from typing import Collection
 
-import funcy
-
 from .logging import logger
 from .money import Money
 
 
-@dataclass
+@dataclass(slots=True)
 class Account:
     """An Account represents current and future money of a user in the ledger"""
 
@@ -30,6 +30,8 @@ class Account:
 class PositiveAccount(Account):
     """An account whose balance cannot get negative"""
 
+    __slots__ = ()
+
     def change_balance(self, amount: Money):
         if -amount > self.balance:
             raise RuntimeError("account balance cannot be negative")
@@ -38,6 +40,10 @@ class PositiveAccount(Account):
 
 type Name = str
 
+# name of the shared pot account. Identifier-like literals are interned, as
+# are account names, so comparisons against it mostly short-cut on identity
+POT: Name = "POT"
+
 
 class LedgerState(dict[Name, Account]):
     """A collection of accounts with a balance. Represents the state of a ledger at a given point in time.
@@ -52,8 +58,19 @@ class LedgerState(dict[Name, Account]):
     - add an account with name that already exists
     - remove an account that does not exist
     - remove an account that does not have a null balance
+
+    The sum of the account diffs and the names of the user accounts are
+    maintained as changes are applied through the methods of this class, so
+    that checking the equilibrium and sharing between all users are cheap.
     """
 
+    __slots__ = ("_diff_sum", "_user_names")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._diff_sum = sum(map(attrgetter("diff"), self.values()), Money(0))
+        self._user_names = tuple(name for name in self if name != POT)
+
     @classmethod
     def _validate_name(cls, name):
         if not isinstance(name, str):
@@ -65,49 +82,70 @@ class LedgerState(dict[Name, Account]):
         self._validate_name(name)
         if name in self:
             raise RuntimeError("account already exists")
+        # names are looked up for every change: interned keys compare by identity
+        name = sys.intern(name)
         self[name] = Account()
+        if name != POT:
+            self._user_names += (name,)
 
     def remove_account(self, name: str):
-        try:
-            if not self[name].is_settled:
-                raise RuntimeError("account cannot be removed if not settled")
-            del self[name]
-        except KeyError:
-            raise RuntimeError("account does not exists")
+        if not self._get_account(name).is_settled:
+            raise RuntimeError("account cannot be removed if not settled")
+        del self[name]
+        self._user_names = tuple(
+            user_name for user_name in self._user_names if user_name != name
+        )
 
     def add_pot(self):
-        self["POT"] = PositiveAccount()
+        if self.has_pot:
+            self._diff_sum -= self.pot.diff
+        self[POT] = PositiveAccount()
 
     @property
     def has_pot(self):
-        return "POT" in self
+        return POT in self
+
+    @property
+    def user_names(self) -> tuple[Name, ...]:
+        return self._user_names
 
     @property
     def user_accounts(self) -> dict:
-        accounts = funcy.omit(self, "POT")
-        assert isinstance(accounts, dict)  # reassure typing
-        return accounts
+        return {name: self[name] for name in self._user_names}
+
+    def user_accounts_by_diff(self) -> list[tuple[Name, Account]]:
+        """User accounts, from the largest to the smallest diff"""
+        return sorted(
+            ((name, self[name]) for name in self._user_names),
+            key=lambda item: item[1].diff,
+            reverse=True,
+        )
 
     @property
     def pot(self):
-        return self["POT"]
+        return self[POT]
 
-    def change_balance(self, name: str, amount: Money):
-        logger.debug(f"balance change: {name} {amount!s}")
-        try:
-            self[name].change_balance(amount)
-        except KeyError:
+    def _get_account(self, name: Name) -> Account:
+        if (account := self.get(name)) is None:
             raise RuntimeError("account does not exists")
+        return account
+
+    def change_balance(self, name: str, amount: Money):
+        # values passed as arguments: loguru formats them only if debug is enabled
+        logger.debug("balance change: {} {!s}", name, amount)
+        self._get_account(name).change_balance(amount)
 
     def change_diff(self, name: str, amount: Money):
-        logger.debug(f"difference change: {name} {amount!s}")
-        try:
-            self[name].change_diff(amount)
-        except KeyError:
-            raise RuntimeError("account does not exists")
+        logger.debug("difference change: {} {!s}", name, amount)
+        self._change_account_diff(self._get_account(name), amount)
+
+    def _change_account_diff(self, account: Account, amount: Money):
+        # every diff change goes through here, to keep the sum of diffs exact
+        account.change_diff(amount)
+        self._diff_sum += amount
 
     def check_equilibrium(self):
-        if (error := sum(account.diff for account in self.values())) != 0:
+        if (error := self._diff_sum) != 0:
             raise RuntimeError(f"accounts not equilibrated. Sum of diffs is {error:+}")
 
     def create_debt(
@@ -125,22 +163,34 @@ class LedgerState(dict[Name, Account]):
         More precisely:
             individual_creditor_balance_change = amount / len(add_to)
             individual_debitor_balance_change = - amount / len(substract_from)"""
-        creditors = (
-            funcy.lremove("POT", self.keys()) if creditors is None else creditors
-        )
-        debitors = funcy.lremove("POT", self.keys()) if debitors is None else debitors
-        for creditor, balance_change in zip(
-            creditors, amount.divide_with_no_rest(len(creditors))
-        ):
-            self.change_diff(creditor, balance_change)
-        for debitor, balance_change in zip(
-            debitors, amount.divide_with_no_rest(len(debitors))
-        ):
-            self.change_diff(debitor, -balance_change)
+        if creditors is None:
+            creditors = self._user_names
+        if debitors is None:
+            debitors = self._user_names
+        logger.debug("debt of {!s}: {} -> {}", amount, debitors, creditors)
+        # resolve all accounts before changing any of them
+        creditor_accounts = [self._get_account(name) for name in creditors]
+        debitor_accounts = [self._get_account(name) for name in debitors]
+        if len(creditor_accounts) == 1 and len(debitor_accounts) == 1:
+            # most debts are between two accounts: nothing to split
+            self._change_account_diff(creditor_accounts[0], amount)
+            self._change_account_diff(debitor_accounts[0], -amount)
+            return
+        creditor_shares = amount.divide_with_no_rest(len(creditor_accounts))
+        if len(debitor_accounts) == len(creditor_accounts):
+            debitor_shares = creditor_shares
+        else:
+            debitor_shares = amount.divide_with_no_rest(len(debitor_accounts))
+        for account, balance_change in zip(creditor_accounts, creditor_shares):
+            self._change_account_diff(account, balance_change)
+        for account, balance_change in zip(debitor_accounts, debitor_shares):
+            self._change_account_diff(account, -balance_change)
 
     def internal_transfer(self, amount: Money, sender: Name, receiver: Name):
-        logger.debug(f"transfering {amount} from {sender} to {receiver}")
-        self.change_balance(sender, -amount)
-        self.change_balance(receiver, amount)
-        self.change_diff(sender, amount)
-        self.change_diff(receiver, -amount)
+        logger.debug("transfering {} from {} to {}", amount, sender, receiver)
+        sender_account = self._get_account(sender)
+        receiver_account = self._get_account(receiver)
+        sender_account.change_balance(-amount)
+        receiver_account.change_balance(amount)
+        self._change_account_diff(sender_account, amount)
+        self._change_account_diff(receiver_account, -amount)
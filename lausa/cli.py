@@ -1,23 +1,13 @@
 import time
-from operator import xor
 
 import click
-from rich import print
-from rich.live import Live
-
-from .display import (
-    expense_groups_comparison,
-    expense_view,
-    file_modification_timestamp,
-    filtered_expense_view,
-    ledger_view,
-    operation_table,
-    state_view,
-    tag_count_table,
-)
+
 from .ledger import Ledger
 from .logging import logger
 
+# rich and the display module are imported by the commands that render,
+# so that recording commands do not pay for loading them
+
 main = click.Group()
 
 
@@ -32,39 +22,54 @@ def init():
 @main.command
 def watch():
     """Print the content of the ledger file"""
+    from rich.live import Live
+
+    from .display import ledger_file_key, ledger_view
+
     logger.remove()
-    last_timestamp = file_modification_timestamp(Ledger.LEDGER_FILE)
-    with Live(ledger_view(), screen=True) as live:
+    last_file_key = ledger_file_key()
+    # no auto refresh: the screen is only redrawn when the ledger or the terminal changes
+    with Live(ledger_view(last_file_key), screen=True, auto_refresh=False) as live:
+        last_size = live.console.size
         while True:
             time.sleep(0.25)
-            new_timestamp = file_modification_timestamp(Ledger.LEDGER_FILE)
-            # one of the two timestamp is None: ledger just got deleted or created
-            if xor(last_timestamp is None, new_timestamp is None) or (
-                (last_timestamp and new_timestamp) and new_timestamp > last_timestamp
-            ):
-                last_timestamp = new_timestamp
-                live.update(ledger_view())
+            # also covers the ledger file being created or deleted
+            if (new_file_key := ledger_file_key()) != last_file_key:
+                last_file_key = new_file_key
+                live.update(ledger_view(new_file_key), refresh=True)
+            elif (new_size := live.console.size) != last_size:
+                last_size = new_size
+                live.refresh()
 
 
 @main.command
 @click.option("--color/--no-color", default=True)
-def accounts(color):
+@click.option(
+    "--replay",
+    is_flag=True,
+    help="Replay all operations instead of using the saved state, to verify the ledger",
+)
+def accounts(color, replay):
     """Print the state of the accounts"""
-    ledger = Ledger.load_from_file()
+    from rich import print
+
+    from .display import state_view
+
+    ledger = Ledger.load_from_file(use_snapshot=not replay)
     if color:
         print(state_view(ledger))
     else:
-        for name, account in sorted(
-            ledger.state.user_accounts.items(),
-            key=lambda item: item[1].diff,
-            reverse=True,
-        ):
+        for name, account in ledger.state.user_accounts_by_diff():
             print(f"{name}: {account.diff:+}")
 
 
 @main.command
 def operations():
     """List operations"""
+    from rich import print
+
+    from .display import operation_table
+
     ledger = Ledger.load_from_file()
     print(operation_table(ledger.operations))
 
@@ -82,6 +87,10 @@ def list_expenses(tag, no_tag):
     TAG: select expenses with specified TAG
     NO_TAG: select expenses with no tag. overrides TAG option
     """
+    from rich import print
+
+    from .display import expense_view, filtered_expense_view
+
     expenses = Ledger.load_from_file().expenses
     if no_tag:
         print(filtered_expense_view(expenses, None))
@@ -94,6 +103,10 @@ def list_expenses(tag, no_tag):
 @expenses.command("tags")
 def list_tags():
     """List tags found in ledger expenses"""
+    from rich import print
+
+    from .display import tag_count_table
+
     expenses = Ledger.load_from_file().expenses
     print(tag_count_table(expenses))
 
@@ -102,6 +115,10 @@ def list_tags():
 @click.argument("tags", type=click.STRING, nargs=-1)
 def compare_expenses(tags):
     """Compare expenses"""
+    from rich import print
+
+    from .display import expense_groups_comparison
+
     expenses = Ledger.load_from_file().expenses
     print(expense_groups_comparison(expenses, tags))
 
@@ -118,11 +135,14 @@ def undo(index):
 
     INDEX: undo operation at given index
     """
-    with Ledger.edit() as ledger:
-        if index is not None:
-            ledger.records.pop(index - 1)
-        else:
-            ledger.records.pop()
+    try:
+        with Ledger.edit() as ledger:
+            if index is not None:
+                ledger.pop_operation(index - 1)
+            else:
+                ledger.pop_operation()
+    except RuntimeError as error:
+        logger.error(error)
 
 
 @main.group
@@ -1,16 +1,17 @@
-import pathlib
+import functools
+import os
+from datetime import datetime
 from itertools import combinations
 from operator import itemgetter
 from typing import Collection
 
-import arrow
 import funcy
+from rich import box
 from rich.align import Align
-from rich.columns import Columns
 from rich.console import Group, RenderableType
-from rich.layout import Layout
 from rich.panel import Panel
 from rich.rule import Rule
+from rich.style import Style
 from rich.table import Table
 from rich.text import Text
 
@@ -32,49 +33,62 @@ from .operations import (
     TransferDebt,
 )
 
+# styles of the views, parsed once
+BLUE = Style(color="blue")
+CYAN = Style(color="cyan")
+GREEN = Style(color="green")
+MAGENTA = Style(color="magenta")
+RED = Style(color="red")
+YELLOW = Style(color="yellow")
 
-@funcy.ignore(FileNotFoundError)
-def file_modification_timestamp(path):
-    return pathlib.Path(path).stat().st_mtime
 
-
-@funcy.ignore(FileNotFoundError)
-def file_creation_timestamp(path):
-    return pathlib.Path(path).stat().st_atime
+@funcy.ignore(FileNotFoundError, default=(None, None))
+def file_timestamps(path) -> tuple[float | None, float | None]:
+    """Creation and modification timestamps of a file, from a single stat"""
+    stat = os.stat(path)
+    # st_ctime is the last metadata change on unix, not the creation. Birth
+    # time is not available on every platform (e.g. linux)
+    creation = getattr(stat, "st_birthtime", stat.st_atime)
+    return creation, stat.st_mtime
 
 
+@functools.lru_cache(maxsize=256)
 def format_timestamp(timestamp) -> str:
-    return arrow.get(timestamp).to("local").format("YYYY-MM-DD HH:mm:ss")
+    # naive datetime from a timestamp is in local time
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
 
 
 def file_info_view(ledger):
-    file_path = Ledger.LEDGER_FILE
+    from rich.columns import Columns
+
+    # the first file the ledger can be loaded from that exists: usually a
+    # single stat
+    for file_path in Ledger.source_files():
+        creation_timestamp, modification_timestamp = file_timestamps(file_path)
+        if modification_timestamp is not None:
+            break
     return Columns(
         (
-            Text("file: ") + Text(f"{file_path}", style="blue"),
+            Text("file: ") + Text(f"{file_path}", style=BLUE),
             Text("creation: ")
-            + Text(
-                format_timestamp(file_creation_timestamp(file_path)),
-                style="blue",
-            ),
+            + Text(format_timestamp(creation_timestamp), style=BLUE),
             Text("last update: ")
-            + Text(
-                format_timestamp(file_modification_timestamp(file_path)),
-                style="blue",
-            ),
+            + Text(format_timestamp(modification_timestamp), style=BLUE),
         ),
         expand=True,
     )
 
 
+# settled amounts are the common case, and always display the same way
+SETTLED_AMOUNT = Text(str(Money(0)), style=BLUE)
+
+
+# amounts repeat across accounts and refreshes: styled amounts are cached
+@functools.lru_cache(maxsize=1024, typed=True)
 def diff_style(balance) -> Text:
-    balance_float = float(balance)
-    if balance_float > 0:
-        return Text(format(balance, "+"), style="green")
-    elif balance_float < 0:
-        return Text(format(balance, "+"), style="red")
-    else:
-        return Text(str(balance), style="blue")
+    if balance == 0:
+        return SETTLED_AMOUNT
+    return Text(format(balance, "+"), style=GREEN if balance > 0 else RED)
 
 
 def diff_display(ledger, name):
@@ -82,208 +96,238 @@ def diff_display(ledger, name):
 
 
 def pot_state_table(ledger):
+    pot = ledger.state.pot
     table = Table.grid(padding=(0, 2), expand=True)
-    table.add_row("Pot Balance", Text(str(ledger.state.pot.balance), style="blue"))
-    table.add_row("Pot Diff", diff_style(ledger.state.pot.diff))
+    table.add_row("Pot Balance", Text(str(pot.balance), style=BLUE))
+    table.add_row("Pot Diff", diff_style(pot.diff))
 
-    if (pot_expected_balance := ledger.state.pot.balance + ledger.state.pot.diff) < 0:
+    if (pot_expected_balance := pot.balance + pot.diff) < 0:
         table.add_row(
             "Expected Pot Deficit",
-            Text(str(-pot_expected_balance), style="red"),
+            Text(str(-pot_expected_balance), style=RED),
         )
     elif pot_expected_balance > 0:
         table.add_row(
             "Expected Pot Excedent",
-            Text(str(pot_expected_balance), style="green"),
+            Text(str(pot_expected_balance), style=GREEN),
         )
     else:
-        table.add_row("Expected Pot State", Text("0"), style="green")
+        table.add_row("Expected Pot State", Text("0"), style=GREEN)
     return table
 
 
-def accounts_table(ledger):
-    table = Table()
+def accounts_table(ledger, compact=False):
+    """Table of user accounts, sorted by difference.
+
+    compact: lighter borders, for views already framed by a panel
+    """
+    table = Table(box=box.SIMPLE) if compact else Table()
     table.add_column("name")
     table.add_column("difference")
     table.add_column("balance")
-    for name, account in sorted(
-        ledger.state.user_accounts.items(),
-        key=lambda item: item[1].diff,
-        reverse=True,
-    ):
+    for name, account in ledger.state.user_accounts_by_diff():
         table.add_row(name, diff_style(account.diff), diff_style(account.balance))
     return table
 
 
-def state_view(ledger):
+def state_view(ledger, compact=False):
     if ledger.state.has_pot:
         return Group(
             pot_state_table(ledger),
             Rule(),
-            accounts_table(ledger),
+            accounts_table(ledger, compact),
         )
     else:
-        return accounts_table(ledger)
+        return accounts_table(ledger, compact)
+
+
+OPERATION_NAME_STYLES = {
+    # --- edit accounts
+    AddAccount: CYAN,
+    RemoveAccount: CYAN,
+    AddPot: CYAN,
+    # --- money movement
+    SharedExpense: RED,
+    Transfer: RED,
+    Reimburse: RED,
+    PaysContribution: RED,
+    # --- debt movement
+    RequestContribution: BLUE,
+    Debt: BLUE,
+    TransferDebt: BLUE,
+}
 
 
 def operation_name_style(operation):
-    match operation:
-        # --- edit accounts
-        case AddAccount():
-            style = "cyan"
-        case RemoveAccount():
-            style = "cyan"
-        case AddPot():
-            style = "cyan"
-        # --- money movement
-        case SharedExpense():
-            style = "red"
-        case Transfer():
-            style = "red"
-        case Reimburse():
-            style = "red"
-        case PaysContribution():
-            style = "red"
-        # --- debt movement
-        case RequestContribution():
-            style = "blue"
-        case Debt():
-            style = "blue"
-        case TransferDebt():
-            style = "blue"
-        case _:
-            style = ""
-    return Text(operation.__class__.__name__, style=style)
+    operation_class = operation.__class__
+    return Text(
+        operation_class.__name__,
+        style=OPERATION_NAME_STYLES.get(operation_class, ""),
+    )
 
 
 def name_display(name: Name):
-    return Text(name, style="blue")
+    return Text(name, style=BLUE)
 
 
 def money_display(amount: Money):
-    return Text(str(amount), style="green")
+    return Text(str(amount), style=GREEN)
 
 
 def text_display(text: str):
-    return Text(text, style="yellow")
+    return Text(text, style=YELLOW)
 
 
 def tag_display(text: str):
-    return Text(text, style="magenta")
+    return Text(text, style=MAGENTA)
 
 
 def tags_display(tags):
     return Text.assemble("", *funcy.interpose(", ", [tag_display(t) for t in tags]))
 
 
+def _account_operation_description(operation) -> Text:
+    return name_display(operation.name)
+
+
+def _add_pot_description(operation) -> Text:
+    return Text("Add a common pot to the group")
+
+
+# descriptions are assembled in one call: plain strings are appended as is,
+# without building an intermediate Text for each concatenation
+
+
+def _shared_expense_description(operation) -> Text:
+    if operation.tags:
+        tags = (" [", tags_display(operation.tags), "]")
+    else:
+        tags = ()
+    return Text.assemble(
+        name_display(operation.payer),
+        " pays ",
+        money_display(operation.amount),
+        " for ",
+        text_display(operation.subject),
+        *tags,
+    )
+
+
+def _transfer_description(operation) -> Text:
+    return Text.assemble(
+        name_display(operation.sender),
+        " sends ",
+        money_display(operation.amount),
+        " to ",
+        name_display(operation.receiver),
+    )
+
+
+def _reimburse_description(operation) -> Text:
+    return Text.assemble(
+        "Reimburse ",
+        money_display(operation.amount),
+        " to ",
+        name_display(operation.receiver),
+        " from the pot",
+    )
+
+
+def _pays_contribution_description(operation) -> Text:
+    return Text.assemble(
+        name_display(operation.sender),
+        " contributes ",
+        money_display(operation.amount),
+        " to the pot",
+    )
+
+
+def _debt_description(operation) -> Text:
+    return Text.assemble(
+        name_display(operation.debitor),
+        " owes ",
+        money_display(operation.amount),
+        " to ",
+        name_display(operation.creditor),
+        " for ",
+        text_display(operation.subject),
+    )
+
+
+def _request_contribution_description(operation) -> Text:
+    return Text.assemble(
+        "Request contribution of ",
+        money_display(operation.amount),
+        " from everyone",
+    )
+
+
+def _transfer_debt_description(operation) -> Text:
+    return Text.assemble(
+        name_display(operation.new_debitor),
+        " covers ",
+        money_display(operation.amount),
+        " of debt from ",
+        name_display(operation.old_debitor),
+    )
+
+
+OPERATION_DESCRIPTIONS = {
+    # --- edit accounts
+    AddAccount: _account_operation_description,
+    RemoveAccount: _account_operation_description,
+    AddPot: _add_pot_description,
+    # --- money movement
+    SharedExpense: _shared_expense_description,
+    Transfer: _transfer_description,
+    Reimburse: _reimburse_description,
+    PaysContribution: _pays_contribution_description,
+    # --- debt movement
+    Debt: _debt_description,
+    RequestContribution: _request_contribution_description,
+    TransferDebt: _transfer_debt_description,
+}
+
+
 def operation_description(operation) -> Text:
-    match operation:
-        case AddAccount():
-            return name_display(operation.name)
-        case RemoveAccount():
-            return name_display(operation.name)
-        case AddPot():
-            return Text("Add a common pot to the group")
-        # --- money movement
-        case SharedExpense():
-            description = Text.assemble(
-                "",
-                name_display(operation.payer),
-                " pays ",
-                money_display(operation.amount),
-                " for ",
-                text_display(operation.subject),
-            )
-            if operation.tags:
-                description += Text.assemble(
-                    " [",
-                    tags_display(operation.tags),
-                    "]",
-                )
-
-            return description
-        case Transfer():
-            return Text.assemble(
-                Text()
-                + name_display(operation.sender)
-                + Text(" sends ")
-                + money_display(operation.amount)
-                + Text(" to ")
-                + name_display(operation.receiver),
-            )
-        case Reimburse():
-            return (
-                Text("Reimburse ")
-                + money_display(operation.amount)
-                + Text(" to ")
-                + name_display(operation.receiver)
-                + Text(" from the pot")
-            )
-        case PaysContribution():
-            return (
-                Text()
-                + name_display(operation.sender)
-                + Text(" contributes ")
-                + money_display(operation.amount)
-                + Text(" to the pot")
-            )
-        # --- debt movement
-        case Debt():
-            return (
-                Text()
-                + name_display(operation.debitor)
-                + " owes "
-                + money_display(operation.amount)
-                + " to "
-                + name_display(operation.creditor)
-                + " for "
-                + text_display(operation.subject)
-            )
-        case RequestContribution():
-            return (
-                Text("Request contribution of ")
-                + money_display(operation.amount)
-                + Text(" from everyone")
-            )
-        case TransferDebt():
-            return (
-                Text()
-                + name_display(operation.new_debitor)
-                + Text(" covers ")
-                + money_display(operation.amount)
-                + Text(" of debt from ")
-                + name_display(operation.old_debitor)
-            )
-        case _:
-            return Text()
+    # one lookup on the exact class, instead of trying every case in turn
+    describe = OPERATION_DESCRIPTIONS.get(operation.__class__)
+    return describe(operation) if describe is not None else Text()
 
 
 def ledger_summary_view(ledger):
     """View stats about the ledger"""
+    state = ledger.state
     table = Table.grid(padding=(0, 2))
-    table.add_row("users", Text(str(len(ledger.state.user_accounts)), style="blue"))
-    table.add_row(
-        "pot", Text("yes", style="blue") if ledger.state.has_pot else Text("no")
-    )
+    table.add_row("users", Text(str(len(state.user_names)), style=BLUE))
+    table.add_row("pot", Text("yes", style=BLUE) if state.has_pot else Text("no"))
     table.add_row(
         "expenses",
         Text(
             str(ledger.expenses.sum()),
-            style="yellow",
+            style=YELLOW,
         ),
     )
     return table
 
 
+@functools.lru_cache(maxsize=4096, typed=True)
+def operation_row(operation) -> tuple[Text, Text]:
+    """Name and description cells of an operation
+
+    Operations are immutable: rows are reused across reloads of the ledger.
+    The cells, like the amounts from diff_style, are shared instances: do not
+    modify them in place.
+    """
+    return operation_name_style(operation), operation_description(operation)
+
+
 def operation_table(operations):
     """View of a set of operation as a grid"""
     table = Table.grid(padding=(0, 2))
-    for i, operation in reversed(list(enumerate(operations, start=1))):
-        table.add_row(
-            str(i),
-            operation_name_style(operation),
-            operation_description(operation),
-        )
+    # latest first, numbered from 1 for the oldest
+    for i, operation in zip(range(len(operations), 0, -1), reversed(operations)):
+        table.add_row(str(i), *operation_row(operation))
     return table
 
 
@@ -293,7 +337,7 @@ def operation_table(operations):
 def _expense_table(expenses: Expenses) -> RenderableType:
     """View of a collection of expenses in a grid"""
     if not expenses:
-        return Text("no expense to display", style="red")
+        return Text("no expense to display", style=RED)
     table = Table()
     table.add_column("payer")
     table.add_column("amount")
@@ -312,13 +356,13 @@ def _expense_table(expenses: Expenses) -> RenderableType:
 def _expense_summary(expenses: Expenses) -> RenderableType:
     """Stats of a collection of expenses"""
     return Group(
-        Text.assemble("count: ", (str(len(expenses)), "blue")),
+        Text.assemble("count: ", (str(len(expenses)), BLUE)),
         Text.assemble(
             "total: ",
             (
                 # specifying null money for start avoids downcasting result to Decimal
                 str(expenses.sum()),
-                "blue",
+                BLUE,
             ),
         ),
     )
@@ -338,15 +382,15 @@ def _filtered_expense_summary(filtered_expenses: Expenses, expenses: Expenses):
     return Group(
         Text.assemble(
             "count: ",
-            (str(count_filtered), "blue"),
+            (str(count_filtered), BLUE),
             "/",
-            (str(count_full), "green"),
+            (str(count_full), GREEN),
         ),
         Text.assemble(
             "sum: ",
-            (str(sum_filtered), "blue"),
+            (str(sum_filtered), BLUE),
             "/",
-            (str(sum_full), "green"),
+            (str(sum_full), GREEN),
             " (",
             format(float(sum_filtered) / float(sum_full), ".0%"),
             ")",
@@ -363,7 +407,7 @@ def filtered_expense_view(expenses: Expenses, tag: str | None) -> RenderableType
         filtered_expenses = expenses.select_has_tag(tag)
         filter_name = tag
     return Group(
-        Text.assemble("tag filter: ", Text(filter_name, style="magenta")),
+        Text.assemble("tag filter: ", Text(filter_name, style=MAGENTA)),
         _filtered_expense_summary(filtered_expenses, expenses),
         Rule(),
         _expense_table(filtered_expenses),
@@ -384,13 +428,14 @@ def expense_groups_comparison(
     for (tag_left, expenses_left), (tag_right, expenses_right) in combinations(
         tag_groups.items(), 2
     ):
-        intersection = set(map(id, expenses_left)) & set(map(id, expenses_right))
+        left_by_id = {id(expense): expense for expense in expenses_left}
+        intersection = left_by_id.keys() & set(map(id, expenses_right))
         if intersection:
             logger.warning(
                 f"{len(intersection)} expenses have both tags {tag_left} and {tag_right}"
             )
             for expense_id in intersection:
-                logger.warning(expenses.select_by_id(expense_id))
+                logger.warning(left_by_id[expense_id])
             intersect = True
     if intersect:
         logger.warning("overlap in tag groups, aborting comparison")
@@ -452,7 +497,21 @@ class CenteredPanel(Panel):
         )
 
 
-def ledger_view():
+def ledger_file_key() -> tuple[str, int, int] | None:
+    """Identify a version of the ledger file by its path, modification time and size
+
+    The file is the one the ledger is loaded from, possibly a yaml ledger.
+    """
+    for file in Ledger.source_files():
+        try:
+            stat = os.stat(file)
+        except FileNotFoundError:
+            continue
+        return str(file), stat.st_mtime_ns, stat.st_size
+    return None
+
+
+def ledger_view(file_key=None):
     """Full screen view of a ledger.
 
     Displays:
@@ -461,11 +520,26 @@ def ledger_view():
         - latest operations
         - pot state
         - user state
+
+    The view is rebuilt only when the ledger file changes. Callers that
+    already hold the current `ledger_file_key()` can pass it to save a stat.
     """
+    if file_key is None:
+        file_key = ledger_file_key()
+    return _ledger_view(file_key)
+
+
+@functools.lru_cache(maxsize=1)
+def _ledger_view(file_key):
+    # full screen layout is only used by `watch`: imported on demand
+    from rich.layout import Layout
+
+    if file_key is None:
+        return Text("no ledger file", style=RED)
     try:
         ledger = Ledger.load_from_file()
     except FileNotFoundError:
-        return Text("no ledger file", style="red")
+        return Text("no ledger file", style=RED)
     # --------
     screen = Layout()
     screen.split_column(
@@ -488,7 +562,7 @@ def ledger_view():
         CenteredPanel(ledger_summary_view(ledger), title="Summary")
     )
     screen.get("accounts").update(  # type:ignore
-        CenteredPanel(state_view(ledger), title="Accounts")
+        CenteredPanel(state_view(ledger, compact=True), title="Accounts")
     )
     screen.get("right").update(  # type:ignore
         CenteredPanel(
@@ -1,33 +1,90 @@
-from dataclasses import asdict
-
-import funcy
+import functools
+import inspect
+import sys
+from dataclasses import fields
+from types import MappingProxyType
 
 from . import operations
+from .account import Name
 from .money import Money
 from .operations import Operation
 
+# concrete operations, by the name written in the ledger file. Read only
+OPERATION_CLASSES = MappingProxyType(
+    {
+        cls.__name__: cls
+        for cls in vars(operations).values()
+        if inspect.isclass(cls)
+        and issubclass(cls, Operation)
+        and not inspect.isabstract(cls)
+    }
+)
+
 
-def money_to_float(obj):
+def to_plain_value(obj):
+    """Value of an operation field as a json value: Money as a float, tuples as lists"""
     if isinstance(obj, Money):
         return float(obj)
+    elif isinstance(obj, tuple):
+        return list(obj)
     else:
         return obj
 
 
-def number_to_money(obj):
-    if isinstance(obj, (float, int)):
-        return Money(obj)
-    else:
-        return obj
+# conversion of loaded values, by type of operation field. Account names
+# are interned, to match the interned keys of the ledger state
+FIELD_TYPE_CONVERTERS = MappingProxyType(
+    {
+        Money: Money,
+        tuple: tuple,
+        Name: sys.intern,
+    }
+)
+
+
+@functools.cache
+def _field_names(operation_class) -> tuple[str, ...]:
+    return tuple(field.name for field in fields(operation_class))
+
+
+@functools.cache
+def _field_converters(operation_class) -> MappingProxyType:
+    """Conversion of each field of an operation, None for values kept as loaded
+
+    Shared by all loads: read only.
+    """
+    return MappingProxyType(
+        {
+            field.name: FIELD_TYPE_CONVERTERS.get(field.type)
+            for field in fields(operation_class)
+        }
+    )
 
 
 def operation_as_dict(operation: Operation) -> dict:
-    op_as_dict = {"operation": operation.__class__.__name__} | asdict(operation)
-    return funcy.walk_values(money_to_float, op_as_dict)  # type:ignore
+    """Operation as a dict of plain values, that can be serialized as json
+
+    Tuples become lists, and are left out when empty as this is their default.
+    """
+    # fields are flat values: no need for the recursive copy of asdict
+    op_as_dict = {"operation": operation.__class__.__name__}
+    for name in _field_names(operation.__class__):
+        value = getattr(operation, name)
+        if value != ():
+            op_as_dict[name] = to_plain_value(value)
+    return op_as_dict
 
 
 def load_operation_from_dict(op_as_dict) -> Operation:
-    classname = op_as_dict.pop("operation")
-    operation_class = getattr(operations, classname)
-    dict_transformed = funcy.walk_values(number_to_money, op_as_dict)
-    return operation_class(**dict_transformed)  # type:ignore
+    operation_class = OPERATION_CLASSES[op_as_dict["operation"]]
+    converters = _field_converters(operation_class)
+    if unknown_fields := op_as_dict.keys() - converters.keys() - {"operation"}:
+        names = ", ".join(sorted(unknown_fields))
+        raise TypeError(f"{operation_class.__name__} has no field {names}")
+    kwargs = {}
+    for key, value in op_as_dict.items():
+        if key == "operation":
+            continue
+        convert = converters[key]
+        kwargs[key] = value if convert is None else convert(value)
+    return operation_class(**kwargs)  # type:ignore
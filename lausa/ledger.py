@@ -1,13 +1,18 @@
+import json
+import os
 import pathlib
 from contextlib import contextmanager
-from copy import copy
 from dataclasses import dataclass, field
-from typing import Self
+from typing import Iterable, Self
 
-import funcy
 import yaml
 
-from .account import LedgerState
+try:
+    from yaml import CSafeLoader as Loader
+except ImportError:  # pyyaml built without libyaml
+    from yaml import SafeLoader as Loader  # type:ignore
+
+from .account import POT, Account, LedgerState, PositiveAccount
 from .io import load_operation_from_dict, operation_as_dict
 from .logging import logger
 from .money import Money
@@ -26,68 +31,225 @@ from .operations import (
     TransferDebt,
 )
 
+WRITE_BUFFER_SIZE = 16 * 1024
+# compact lines. A single encoder: json.dumps builds a new one per call
+# when given options
+JSON_ENCODER = json.JSONEncoder(separators=(",", ":"))
 
-@dataclass
-class LedgerRecord:
-    state: LedgerState
-    operation: Operation
+
+class LedgerLoader(Loader):
+    """Safe yaml loader for ledger files written before the switch to json lines
+
+    These files also hold tuples as python objects.
+    """
+
+
+LedgerLoader.add_constructor(
+    "tag:yaml.org,2002:python/tuple",
+    lambda loader, node: tuple(loader.construct_sequence(node)),
+)
+
+
+def _file_key(file) -> list[int]:
+    """Identify a version of a file, given by path or descriptor"""
+    stat = os.stat(file)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def replay(operations: Iterable[Operation]) -> LedgerState:
+    """State resulting from applying operations to an empty state"""
+    state = LedgerState()
+    for operation in operations:
+        operation.apply_to(state)
+        state.check_equilibrium()
+    return state
 
 
 @dataclass
 class Ledger:
-    records: list[LedgerRecord] = field(default_factory=list)
-    LEDGER_FILE = "ledger.yml"
+    operations: list[Operation] = field(default_factory=list)
+    # only the current state is kept, and updated in place by apply. Past
+    # states can be recomputed with `replay`
+    state: LedgerState = field(init=False, repr=False, compare=False)
+    LEDGER_FILE = "ledger.jsonl"
     _repr_string = "in-memory"
+    # number of leading operations found in the ledger file, None when the
+    # file is not known to match them
+    _saved_operations = None
+
+    def __post_init__(self):
+        self.state = replay(self.operations)
 
     def __repr__(self):
         return f"{self.__class__.__name__}(<{self._repr_string!r}>)"
 
-    @property
-    def state(self) -> LedgerState:
-        if not self.records:
-            return LedgerState()
-        else:
-            return self.records[-1].state
-
-    @property
-    def operations(self) -> list[Operation]:
-        return [record.operation for record in self.records]
-
     @property
     def expenses(self) -> Expenses:
         return Expenses(
-            funcy.lfilter(funcy.rpartial(isinstance, SharedExpense), self.operations)
+            operation
+            for operation in self.operations
+            if isinstance(operation, SharedExpense)
         )
 
     # ------------------------ IOs ------------------------
 
-    def save_to_file(self):
-        operations_as_dicts = funcy.map(operation_as_dict, self.operations)
-        pathlib.Path(self.LEDGER_FILE).write_text(
-            yaml.dump_all(
-                operations_as_dicts,
-                sort_keys=False,
-            )
+    def _write_operations(self, operations, mode):
+        # one json document per line, in order of application
+        lines = (
+            JSON_ENCODER.encode(operation_as_dict(operation)) + "\n"
+            for operation in operations
         )
+        # many small writes: buffer them, then sync once
+        with open(self.LEDGER_FILE, mode, buffering=WRITE_BUFFER_SIZE) as file:
+            file.writelines(lines)
+            file.flush()
+            os.fsync(file.fileno())
+        self._saved_operations = len(self.operations)
         self._repr_string = self.LEDGER_FILE
+        try:
+            self._save_state()
+        except OSError as error:
+            # the ledger file is saved: without a snapshot, the next load replays
+            logger.debug("state snapshot not saved: {}", error)
 
     @classmethod
-    def load_from_file(cls) -> Self:
-        logger.debug(f"load operations from file: {cls.LEDGER_FILE}")
-        operation_dicts = yaml.load_all(
-            pathlib.Path(cls.LEDGER_FILE).read_text(), Loader=yaml.Loader
+    def _yaml_file(cls) -> pathlib.Path:
+        return pathlib.Path(cls.LEDGER_FILE).with_suffix(".yml")
+
+    @classmethod
+    def source_files(cls) -> tuple[pathlib.Path, pathlib.Path]:
+        """Files the ledger can be loaded from, by order of preference
+
+        A yaml ledger, from before the switch to json lines, is only read when
+        there is no json lines file.
+        """
+        return pathlib.Path(cls.LEDGER_FILE), cls._yaml_file()
+
+    @classmethod
+    def _state_file(cls) -> pathlib.Path:
+        return pathlib.Path(cls.LEDGER_FILE).with_suffix(".state.json")
+
+    def _save_state(self):
+        """Save the current state, for the version of the ledger file just written"""
+        snapshot = {
+            "ledger_file": _file_key(self.LEDGER_FILE),
+            # integer cents: amounts are restored exactly
+            "cents": {
+                name: [account.balance.cents, account.diff.cents]
+                for name, account in self.state.items()
+            },
+        }
+        # not synced: a lost snapshot only means replaying the operations. It
+        # is replaced in one step, so it is never read half written
+        state_file = self._state_file()
+        temporary_file = state_file.with_suffix(".tmp")
+        try:
+            temporary_file.write_text(JSON_ENCODER.encode(snapshot))
+            os.replace(temporary_file, state_file)
+        except OSError:
+            temporary_file.unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def _load_state(cls, file_key) -> LedgerState | None:
+        """Saved state, if it was saved for this version of the ledger file
+
+        The snapshot is only a cache: if it cannot be read, for any reason,
+        None is returned and the operations are replayed.
+        """
+        try:
+            snapshot = json.loads(cls._state_file().read_text())
+            if snapshot["ledger_file"] != file_key:
+                return None
+            return LedgerState(
+                {
+                    name: (PositiveAccount if name == POT else Account)(
+                        balance=Money.from_cents(balance),
+                        diff=Money.from_cents(diff),
+                    )
+                    for name, (balance, diff) in snapshot["cents"].items()
+                }
+            )
+        except (
+            OSError,
+            ValueError,
+            LookupError,
+            TypeError,
+            AttributeError,
+            ArithmeticError,
+        ):
+            logger.debug("unreadable state snapshot")
+            return None
+
+    def save_to_file(self):
+        """Write the whole ledger to the ledger file"""
+        self._write_operations(self.operations, "w")
+
+    def append_to_file(self):
+        """Write to the ledger file the operations it does not have yet
+
+        The file is rewritten if operations it has were removed.
+        """
+        if self._saved_operations is None:
+            self.save_to_file()
+        else:
+            self._write_operations(self.operations[self._saved_operations :], "a")
+
+    @classmethod
+    def load_from_file(cls, use_snapshot=True) -> Self:
+        """Load the ledger saved in the ledger file
+
+        The state saved along the file is used when it matches the file,
+        otherwise all operations are replayed. use_snapshot=False always
+        replays them, to verify the ledger.
+        """
+        logger.debug("load operations from file: {}", cls.LEDGER_FILE)
+        # no existence check: a missing file raises FileNotFoundError on open
+        try:
+            with open(cls.LEDGER_FILE) as file:
+                # blank lines, as left by hand edits, hold no operation
+                operation_dicts = [json.loads(line) for line in file if line.strip()]
+                # after reading: lines appended meanwhile change the key
+                file_key = _file_key(file.fileno())
+            state = cls._load_state(file_key) if use_snapshot else None
+            if state is None:
+                ledger = cls._replay(operation_dicts)
+            else:
+                logger.debug("state loaded from snapshot")
+                ledger = cls()
+                ledger.operations = list(
+                    map(load_operation_from_dict, operation_dicts)
+                )
+                ledger.state = state
+            ledger._saved_operations = len(ledger.operations)
+        except FileNotFoundError:
+            # a yaml ledger is read instead, and saved as json lines on next edit
+            yaml_file = cls._yaml_file()
+            if not yaml_file.exists():
+                raise
+            logger.debug("load operations from yaml file: {}", yaml_file)
+            with open(yaml_file) as file:
+                ledger = cls._replay(yaml.load_all(file, Loader=LedgerLoader))
+            # none of the operations are in the json lines file yet
+            ledger._saved_operations = 0
+        logger.debug("ledger loaded")
+        ledger._repr_string = ledger.LEDGER_FILE
+        return ledger
+
+    @classmethod
+    def _replay(cls, operation_dicts) -> Self:
+        operations = (
+            load_operation_from_dict(operation_dict)
+            for operation_dict in operation_dicts
         )
-        operations = funcy.map(load_operation_from_dict, operation_dicts)
         logger.debug("replay operations")
         ledger = cls()
         for operation in operations:
-            logger.debug(f"apply operation: {operation}")
+            logger.debug("apply operation: {}", operation)
             try:
                 ledger.apply(operation)
             except RuntimeError as e:
                 raise RuntimeError(f"applying operation failed: {operation}") from e
-        logger.debug("ledger loaded")
-        ledger._repr_string = ledger.LEDGER_FILE
         return ledger
 
     @classmethod
@@ -95,24 +257,36 @@ class Ledger:
     def edit(cls) -> Self:  # type: ignore
         ledger = cls.load_from_file()
         yield ledger  # type: ignore
-        ledger.save_to_file()
+        ledger.append_to_file()
 
     # ------------------------ record ------------------------
 
     def apply(self, operation):
         try:
-            new_state = copy(self.state)
-            operation.apply_to(new_state)
-            new_state.check_equilibrium()
+            operation.apply_to(self.state)
+            self.state.check_equilibrium()
         except:
             logger.error("operation could not been applied")
+            # the operation may have been partially applied
+            self.state = replay(self.operations)
             raise
-        self.records.append(LedgerRecord(operation=operation, state=new_state))
+        self.operations.append(operation)
+
+    def pop_operation(self, index: int = -1) -> Operation:
+        """Remove an operation. Fails if the following ones no longer apply"""
+        position = range(len(self.operations))[index]
+        self.state = replay(
+            self.operations[:position] + self.operations[position + 1 :]
+        )
+        operation = self.operations.pop(position)
+        if self._saved_operations is not None and position < self._saved_operations:
+            self._saved_operations = None
+        return operation
 
     # ------------------------ convenience ------------------------
 
     def _record(self, operation):
-        logger.debug(f"record operation: {operation}")
+        logger.debug("record operation: {}", operation)
         self.apply(operation)
 
     def add_account(self, name):
@@ -1,18 +1,25 @@
 from decimal import Decimal
 from typing import Self
 
-import funcy
-
 # ------------------------ decimal ------------------------
 
 type Amount = Decimal | int
 
+# built once: quantizing is done for every amount created
+CENT = Decimal("0.01")
+
 
 class Money(Decimal):
     CURRENCY = "€"
 
     def __new__(cls, number):
-        return super().__new__(cls, Decimal(number).quantize(Decimal("0.01")))
+        if type(number) is cls:
+            # already rounded to the cent, and immutable
+            return number
+        if isinstance(number, Decimal):
+            # results of decimal arithmetic: no copy before rounding
+            return super().__new__(cls, number.quantize(CENT))
+        return super().__new__(cls, Decimal(number).quantize(CENT))
 
     def __repr__(self):
         return f"{self.__class__.__name__}('{super().__str__()}')"
@@ -23,14 +30,24 @@ class Money(Decimal):
     def __format__(self, fmt):  # type:ignore
         return super().__format__(fmt) + self.CURRENCY
 
+    @classmethod
+    def _from_cent_exact(cls, number: Decimal) -> Self:
+        """Wrap a decimal already rounded to the cent, skipping quantization"""
+        return Decimal.__new__(cls, number)
+
     def __add__(self, something):
+        # sums and differences of cent amounts and integers stay cent-exact
+        if isinstance(something, (Money, int)):
+            return self._from_cent_exact(super().__add__(something))
         return self.__class__(super().__add__(something))
 
     def __sub__(self, something):
+        if isinstance(something, (Money, int)):
+            return self._from_cent_exact(super().__sub__(something))
         return self.__class__(super().__sub__(something))
 
     def __neg__(self):
-        return self.__class__(super().__neg__())
+        return self._from_cent_exact(super().__neg__())
 
     def __truediv__(self, something):
         return self.__class__(super().__truediv__(something))
@@ -38,14 +55,20 @@ class Money(Decimal):
     def __mul__(self, something):
         return self.__class__(super().__mul__(something))
 
+    @classmethod
+    def from_cents(cls, cents: int) -> Self:
+        return cls._from_cent_exact(Decimal(cents).scaleb(-2))
+
+    @property
+    def cents(self) -> int:
+        return int(self.scaleb(2))
+
     def divide_with_no_rest(self, by: int) -> list[Self]:
         """Split a into parts as equal as possible, without error, rounded to cent"""
-        quantized_result = self / by
-        remainder = self - quantized_result * by
-        return funcy.lmap(
-            self.__class__,
-            funcy.concat(
-                [quantized_result + remainder],
-                funcy.repeat(quantized_result, by - 1),
-            ),
-        )
+        cents = self.cents
+        # share rounded half to even, as decimal division does
+        share, rest = divmod(cents, by)
+        if 2 * rest > by or (2 * rest == by and share % 2):
+            share += 1
+        first_share = self.from_cents(cents - share * (by - 1))
+        return [first_share] + [self.from_cents(share)] * (by - 1)
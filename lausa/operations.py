@@ -1,18 +1,17 @@
 from abc import ABC, abstractmethod
 from collections import Counter, UserList
 from dataclasses import dataclass, field
-from operator import attrgetter
 from typing import Mapping, cast
 
 import funcy
 
-from .account import LedgerState, Name
+from .account import POT, LedgerState, Name
 from .money import Money
 
 # -------- account management
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Operation(ABC):
     """An Operation is an action that transforms the ledger state."""
 
@@ -23,20 +22,21 @@ class Operation(ABC):
 # -------- account management
 
 
-class AccountOperation(Operation): ...
+class AccountOperation(Operation):
+    __slots__ = ()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AddAccount(AccountOperation):
     name: Name
 
     def apply_to(self, state: LedgerState):
-        if self.name == "POT":
+        if self.name == POT:
             raise ValueError("'POT' is a reserved account name")
         state.add_account(self.name)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RemoveAccount(AccountOperation):
     name: Name
 
@@ -45,6 +45,8 @@ class RemoveAccount(AccountOperation):
 
 
 class AddPot(AccountOperation):
+    __slots__ = ()
+
     def apply_to(self, state: LedgerState):  # type:ignore
         if state.has_pot:
             raise RuntimeError("Ledger already has a pot")
@@ -55,10 +57,11 @@ class AddPot(AccountOperation):
 # -------- debt movements
 
 
-class AccountingOperation(Operation): ...
+class AccountingOperation(Operation):
+    __slots__ = ()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Debt(AccountingOperation):
     amount: Money
     creditor: Name
@@ -71,7 +74,7 @@ class Debt(AccountingOperation):
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TransferDebt(AccountingOperation):
     amount: Money
     old_debitor: Name
@@ -85,7 +88,7 @@ class TransferDebt(AccountingOperation):
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RequestContribution(AccountingOperation):
     amount: Money
 
@@ -94,26 +97,32 @@ class RequestContribution(AccountingOperation):
             raise RuntimeError(
                 "RequestContribution only applies to a ledger with a pot"
             )
-        state.create_debt(
-            amount=self.amount * (len(state) - 1), creditors=["POT"], debitors=None
-        )
+        # the pot is credited the contribution of every user
+        total = Money.from_cents(self.amount.cents * len(state.user_names))
+        state.create_debt(amount=total, creditors=[POT], debitors=None)
 
 
 # -------- money movements
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SharedExpense(AccountingOperation):
     amount: Money
     payer: Name
     subject: str
     tags: tuple = field(default_factory=tuple)
 
+    def __post_init__(self):
+        # tags may be given as any iterable: kept as a tuple so that
+        # operations stay hashable
+        if type(self.tags) is not tuple:
+            object.__setattr__(self, "tags", tuple(self.tags))
+
     def apply_to(self, state: LedgerState):
         state.change_balance(self.payer, amount=-self.amount)
         if state.has_pot:
             state.create_debt(
-                amount=self.amount, creditors=[self.payer], debitors=["POT"]
+                amount=self.amount, creditors=[self.payer], debitors=[POT]
             )
         else:
             state.create_debt(amount=self.amount, creditors=[self.payer], debitors=None)
@@ -128,28 +137,25 @@ class Expenses(UserList[SharedExpense]):
 
     # -------- selection
 
-    def _filter(self, filter_):
-        return self.__class__(funcy.lfilter(filter_, self))
+    # selections are single comprehensions over the expenses, with the tags
+    # tested by set operations rather than one predicate per tag
 
     def select_has_no_tag(self):
-        return self._filter(funcy.complement(attrgetter("tags")))
+        return self.__class__(expense for expense in self if not expense.tags)
 
     def select_has_tag(self, tag):
-        return self._filter(funcy.rpartial(SharedExpense.has_tag, tag))
+        return self.__class__(expense for expense in self if tag in expense.tags)
 
     def select_has_all_tags(self, *tags):
-        return self._filter(
-            funcy.all_fn(*(funcy.rpartial(SharedExpense.has_tag, tag) for tag in tags))
+        tags = frozenset(tags)
+        return self.__class__(
+            expense for expense in self if tags.issubset(expense.tags)
         )
 
     def select_has_none_of_tags(self, *tags):
-        return self._filter(
-            funcy.all_fn(
-                *(
-                    funcy.complement(funcy.rpartial(SharedExpense.has_tag, tag))
-                    for tag in tags
-                )
-            )
+        tags = frozenset(tags)
+        return self.__class__(
+            expense for expense in self if tags.isdisjoint(expense.tags)
         )
 
     def select_by_id(self, id_: int):
@@ -171,13 +177,11 @@ class Expenses(UserList[SharedExpense]):
     # -------- aggregation
 
     def sum(self) -> Money:
-        return sum(
-            funcy.map(attrgetter("amount"), self),
-            start=Money(0),
-        )
+        # amounts added as integer cents, with no decimal arithmetic
+        return Money.from_cents(sum(expense.amount.cents for expense in self))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Transfer(AccountingOperation):
     amount: Money
     sender: Name
@@ -189,7 +193,7 @@ class Transfer(AccountingOperation):
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Reimburse(AccountingOperation):
     amount: Money
     receiver: Name
@@ -198,11 +202,11 @@ class Reimburse(AccountingOperation):
         if not state.has_pot:
             raise RuntimeError("Reimburse only applies to a ledger with a pot")
         state.internal_transfer(
-            amount=self.amount, sender="POT", receiver=self.receiver
+            amount=self.amount, sender=POT, receiver=self.receiver
         )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PaysContribution(AccountingOperation):
     amount: Money
     sender: Name
@@ -210,4 +214,4 @@ class PaysContribution(AccountingOperation):
     def apply_to(self, state: LedgerState):
         if not state.has_pot:
             raise RuntimeError("PaysContribution only applies to a ledger with a pot")
-        state.internal_transfer(amount=self.amount, sender=self.sender, receiver="POT")
+        state.internal_transfer(amount=self.amount, sender=self.sender, receiver=POT)
@@ -1,3 +1,6 @@
+import sys
+from copy import copy
+
 from pytest import fixture, raises
 
 from lausa.account import Account, LedgerState, PositiveAccount
@@ -82,6 +85,13 @@ def test__LedgerState__add_account():
     assert state == {"antoine": Account(balance=Money(0), diff=Money(0))}
 
 
+def test__LedgerState__add_account__interned_name():
+    state = LedgerState()
+    name = "".join(["anto", "ine"])
+    state.add_account(name)
+    assert next(iter(state)) is sys.intern(name)
+
+
 def test__LedgerState__add_account__invalid():
     state = LedgerState()
     # not a string
@@ -262,3 +272,60 @@ def test__LedgerState__create_debt__all_to_all(ledger_state):
         "baptiste": Account(balance=Money("0.00"), diff=Money("0.00")),
         "renan": Account(balance=Money("0.00"), diff=Money("0.00")),
     }
+
+
+def test__LedgerState__create_debt__unknown_account(ledger_state):
+    with raises(RuntimeError):
+        ledger_state.create_debt(
+            amount=Money(10), creditors=["antoine"], debitors=["kriti"]
+        )
+    # no account was changed
+    assert all(account.is_settled for account in ledger_state.values())
+
+
+def test__LedgerState__check_equilibrium__after_operations(ledger_state_with_pot):
+    state = ledger_state_with_pot
+    state.create_debt(amount=Money(10), creditors=None, debitors=["POT"])
+    state.internal_transfer(Money(5), sender="antoine", receiver="POT")
+    state.check_equilibrium()
+    # the tracked sum is carried over by copies
+    state_copy = copy(state)
+    state_copy.change_diff("antoine", Money(1))
+    with raises(RuntimeError):
+        state_copy.check_equilibrium()
+    state.check_equilibrium()
+
+
+def test__LedgerState__check_equilibrium__bad_split(ledger_state, mocker):
+    # shares not adding up to the amount
+    mocker.patch.object(
+        Money, "divide_with_no_rest", lambda self, by: [Money(1)] * by
+    )
+    ledger_state.create_debt(amount=Money(10), creditors=["antoine"], debitors=None)
+    with raises(RuntimeError):
+        ledger_state.check_equilibrium()
+
+
+def test__LedgerState__user_names(ledger_state):
+    assert ledger_state.user_names == ("antoine", "baptiste", "renan")
+    ledger_state.add_pot()
+    ledger_state.add_account("kriti")
+    ledger_state.add_account("POT2")
+    ledger_state.remove_account("baptiste")
+    assert ledger_state.user_names == ("antoine", "renan", "kriti", "POT2")
+    assert copy(ledger_state).user_names == ledger_state.user_names
+    assert LedgerState(ledger_state).user_names == ledger_state.user_names
+
+
+def test__LedgerState__user_accounts_by_diff(ledger_state_with_pot):
+    ledger_state_with_pot.create_debt(
+        amount=Money(10), creditors=["renan"], debitors=["POT"]
+    )
+    ledger_state_with_pot.create_debt(
+        amount=Money(4), creditors=["POT"], debitors=["antoine"]
+    )
+    assert ledger_state_with_pot.user_accounts_by_diff() == [
+        ("renan", Account(balance=Money(0), diff=Money(10))),
+        ("baptiste", Account(balance=Money(0), diff=Money(0))),
+        ("antoine", Account(balance=Money(0), diff=Money(-4))),
+    ]
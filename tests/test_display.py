@@ -1,8 +1,19 @@
+import os
+
+from pytest import fixture
+from rich.console import Console
+
 from lausa.display import (
-    file_creation_timestamp,
-    file_modification_timestamp,
+    diff_style,
+    file_timestamps,
+    ledger_file_key,
+    ledger_view,
     operation_description,
+    operation_name_style,
+    operation_row,
+    operation_table,
 )
+from lausa.ledger import Ledger
 from lausa.money import Money
 from lausa.operations import (
     AddAccount,
@@ -20,35 +31,65 @@ from lausa.operations import (
 # ------------------------ file ------------------------
 
 
-def test__modification_timestamp(tmp_path):
+def test__file_timestamps__modification(tmp_path):
     file = tmp_path / "file"
     # no file
-    assert file_modification_timestamp(file) is None
+    assert file_timestamps(file) == (None, None)
     # timestamp is a stable number
     file.write_text("something")
-    first_timestamp = file_modification_timestamp(file)
+    _, first_timestamp = file_timestamps(file)
     assert first_timestamp is not None
     assert isinstance(first_timestamp, float)
-    assert file_modification_timestamp(file) == first_timestamp
+    assert file_timestamps(file)[1] == first_timestamp
     # timestamp changes after a write
     file.write_text("something more")
-    second_timestamp = file_modification_timestamp(file)
+    _, second_timestamp = file_timestamps(file)
     assert second_timestamp > first_timestamp
 
 
-def test__creation_timestamp(tmp_path):
+def test__file_timestamps__creation(tmp_path):
     file = tmp_path / "file"
-    # no file: None
-    assert file_creation_timestamp(file) is None
     # indicates creation time
     file.write_text("something")
-    first_timestamp = file_creation_timestamp(file)
+    first_timestamp, _ = file_timestamps(file)
     assert isinstance(first_timestamp, float)
     # do not change over time
-    assert file_creation_timestamp(file) == first_timestamp
+    assert file_timestamps(file)[0] == first_timestamp
     # ... even after a update
     file.write_text("something more")
-    assert file_creation_timestamp(file) == first_timestamp
+    assert file_timestamps(file)[0] == first_timestamp
+
+
+@fixture
+def tmp_ledger_file(mocker, tmp_path):
+    mocker.patch.object(Ledger, "LEDGER_FILE", tmp_path / Ledger.LEDGER_FILE)
+
+
+def test__ledger_view__cached_on_file_change(tmp_ledger_file):
+    # no file
+    assert ledger_view().plain == "no ledger file"
+    # view is reused while the file is unchanged
+    ledger = Ledger()
+    ledger.add_account("antoine")
+    ledger.save_to_file()
+    view = ledger_view()
+    assert ledger_view() is view
+    # ... and rebuilt once it changes
+    ledger.add_account("baptiste")
+    ledger.save_to_file()
+    os.utime(Ledger.LEDGER_FILE, ns=(0, 0))
+    assert ledger_view() is not view
+
+
+def test__ledger_view__yaml_ledger_file(tmp_ledger_file):
+    yaml_file = Ledger.source_files()[1]
+    yaml_file.write_text("operation: AddAccount\nname: antoine\n")
+    assert ledger_file_key()[0] == str(yaml_file)
+    console = Console(width=120, height=30)
+    with console.capture() as capture:
+        console.print(ledger_view())
+    assert "no ledger file" not in capture.get()
+    assert "antoine" in capture.get()
 
 
 # ------------------------ operation description ------------------------
@@ -154,3 +195,49 @@ def test__describe__TransferDebt():
         ).markup
         == "[blue]renan[/blue] covers [green]100.00€[/green] of debt from [blue]baptiste[/blue]"
     )
+
+
+# ------------------------ amounts ------------------------
+
+
+def test__diff_style():
+    assert diff_style(Money(10)).markup == "[green]+10.00€[/green]"
+    assert diff_style(Money(-10)).markup == "[red]-10.00€[/red]"
+    assert diff_style(Money(0)).markup == "[blue]0.00€[/blue]"
+    assert diff_style(-Money(0)).markup == "[blue]0.00€[/blue]"
+
+
+def test__diff_style__cached():
+    assert diff_style(Money(10)) is diff_style(Money("10.00"))
+    # same value, different type: not shared
+    assert diff_style(10).markup == "[green]+10[/green]"
+
+
+# ------------------------ operation name ------------------------
+
+
+def test__operation_name_style():
+    assert operation_name_style(AddPot()).markup == "[cyan]AddPot[/cyan]"
+    assert (
+        operation_name_style(Transfer(Money(1), "antoine", "renan")).markup
+        == "[red]Transfer[/red]"
+    )
+    assert (
+        operation_name_style(RequestContribution(Money(1))).markup
+        == "[blue]RequestContribution[/blue]"
+    )
+
+
+def test__operation_row__cached():
+    name, description = operation_row(Transfer(Money(1), "antoine", "renan"))
+    assert name.markup == "[red]Transfer[/red]"
+    assert description.markup == (
+        "[blue]antoine[/blue] sends [green]1.00€[/green] to [blue]renan[/blue]"
+    )
+    # equal operations, as loaded again from the ledger file, share their row
+    assert operation_row(Transfer(Money(1), "antoine", "renan"))[1] is description
+
+
+def test__operation_table__tags_as_list():
+    expense = SharedExpense(Money(30), "baptiste", "huevos", tags=["animal"])
+    assert operation_table([expense]).row_count == 1
@@ -1,3 +1,7 @@
+import sys
+
+from pytest import raises
+
 from lausa.io import load_operation_from_dict, operation_as_dict
 from lausa.money import Money
 from lausa.operations import (
@@ -47,6 +51,21 @@ def test__SharedExpense():
     assert load_operation_from_dict(operation_dict) == operation
 
 
+def test__SharedExpense__tags():
+    operation = SharedExpense(
+        amount=Money(10), payer="antoine", subject="pan", tags=("asset", "kitchen")
+    )
+    operation_dict = operation_as_dict(operation)
+    assert operation_dict == {
+        "operation": "SharedExpense",
+        "amount": 10.0,
+        "payer": "antoine",
+        "subject": "pan",
+        "tags": ["asset", "kitchen"],
+    }
+    assert load_operation_from_dict(operation_dict) == operation
+
+
 def test__Debt():
     operation = Debt(
         amount=Money(10), debitor="baptiste", creditor="renan", subject="eggs"
@@ -118,3 +137,34 @@ def test__PaysContribution():
         "sender": "baptiste",
     }
     assert load_operation_from_dict(operation_dict) == operation
+
+
+def test__load__interned_account_names():
+    operation_dict = {
+        "operation": "Transfer",
+        "amount": 100.0,
+        "sender": "".join(["anto", "ine"]),
+        "receiver": "baptiste",
+    }
+    operation = load_operation_from_dict(operation_dict)
+    assert operation.sender is sys.intern("antoine")
+
+
+def test__load__does_not_modify_dict():
+    operation_dict = {"operation": "AddAccount", "name": "antoine"}
+    load_operation_from_dict(operation_dict)
+    assert operation_dict == {"operation": "AddAccount", "name": "antoine"}
+
+
+def test__load__not_an_operation():
+    with raises(KeyError):
+        load_operation_from_dict({"operation": "Money"})
+    with raises(KeyError):
+        load_operation_from_dict({"operation": "AccountOperation"})
+
+
+def test__load__unknown_field():
+    with raises(TypeError, match="amount"):
+        load_operation_from_dict(
+            {"operation": "AddAccount", "name": "antoine", "amount": 3.0}
+        )
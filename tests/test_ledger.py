@@ -1,7 +1,8 @@
+import json
 import pathlib
 from textwrap import dedent
 
-from pytest import fixture
+from pytest import fixture, raises
 
 from lausa.account import Account, PositiveAccount
 from lausa.ledger import Ledger
@@ -54,6 +55,52 @@ def test__Ledger__scenario__populate_ledger():
     }
 
 
+def test__Ledger__pop_operation(ledger):
+    assert ledger.pop_operation() == AddAccount(name="renan")
+    assert ledger.state == {
+        "antoine": Account(balance=Money("0.00"), diff=Money("0.00")),
+        "baptiste": Account(balance=Money("0.00"), diff=Money("0.00")),
+    }
+    assert ledger.pop_operation(0) == AddAccount(name="antoine")
+    assert ledger.operations == [AddAccount(name="baptiste")]
+    ledger.pop_operation()
+    assert ledger.state == {}
+
+
+def test__Ledger__pop_operation__past_operation(ledger):
+    ledger.record_transfer(10, "antoine", "baptiste")
+    ledger.record_shared_expense(amount=30, name="renan", subject="potatoes")
+    # following operations must still apply
+    with raises(RuntimeError):
+        ledger.pop_operation(0)
+    assert len(ledger.operations) == 5
+    ledger.pop_operation(3)
+    assert ledger.state == {
+        "antoine": Account(balance=Money("0.00"), diff=Money("-10.00")),
+        "baptiste": Account(balance=Money("0.00"), diff=Money("-10.00")),
+        "renan": Account(balance=Money("-30.00"), diff=Money("20.00")),
+    }
+
+
+def test__Ledger__apply__failure_leaves_state_unchanged(ledger):
+    ledger.add_pot()
+    ledger.record_shared_expense(amount=30, name="antoine", subject="potatoes")
+    # accounts are changed in place: compare their values
+    state_before = {
+        name: (account.balance, account.diff)
+        for name, account in ledger.state.items()
+    }
+    # fails part-way: the sender is credited before the pot refuses to go
+    # below zero
+    with raises(RuntimeError):
+        ledger.record_transfer(amount=-10, sender="baptiste", receiver="POT")
+    assert {
+        name: (account.balance, account.diff)
+        for name, account in ledger.state.items()
+    } == state_before
+    assert len(ledger.operations) == 5
+
+
 def test__Ledger__scenario__shared_expense(ledger):
     ledger.record_shared_expense(amount=125, name="antoine", subject="potatoes")
     ledger.record_shared_expense(amount=30, name="baptiste", subject="choucroute")
@@ -237,45 +284,21 @@ def ledger_with_operations(ledger):
     return ledger
 
 
-def test__Ledger__save_to_file(ledger_with_operations):
+def test__Ledger__save_to_file(ledger_with_operations, tmp_ledger_file):
     ledger_with_operations.save_to_file()
     file_content = pathlib.Path(ledger_with_operations.LEDGER_FILE).read_text()
     assert file_content == dedent(
         """\
-        operation: AddAccount
-        name: antoine
-        ---
-        operation: AddAccount
-        name: baptiste
-        ---
-        operation: AddAccount
-        name: renan
-        ---
-        operation: AddPot
-        ---
-        operation: RequestContribution
-        amount: 50.0
-        ---
-        operation: PaysContribution
-        amount: 50.0
-        sender: antoine
-        ---
-        operation: PaysContribution
-        amount: 30.0
-        sender: baptiste
-        ---
-        operation: PaysContribution
-        amount: 50.0
-        sender: renan
-        ---
-        operation: SharedExpense
-        amount: 125.0
-        payer: antoine
-        subject: potatoes
-        ---
-        operation: Reimburse
-        amount: 100.0
-        receiver: antoine
+        {"operation":"AddAccount","name":"antoine"}
+        {"operation":"AddAccount","name":"baptiste"}
+        {"operation":"AddAccount","name":"renan"}
+        {"operation":"AddPot"}
+        {"operation":"RequestContribution","amount":50.0}
+        {"operation":"PaysContribution","amount":50.0,"sender":"antoine"}
+        {"operation":"PaysContribution","amount":30.0,"sender":"baptiste"}
+        {"operation":"PaysContribution","amount":50.0,"sender":"renan"}
+        {"operation":"SharedExpense","amount":125.0,"payer":"antoine","subject":"potatoes"}
+        {"operation":"Reimburse","amount":100.0,"receiver":"antoine"}
         """
     )
 
@@ -286,6 +309,106 @@ def test__Ledger__load_from_file(ledger_with_operations, tmp_ledger_file):
     assert ledger_loaded.state == ledger_with_operations.state
 
 
+def test__Ledger__load_from_file__snapshot(ledger_with_operations, tmp_ledger_file):
+    ledger_with_operations.save_to_file()
+    ledger_loaded = Ledger.load_from_file()
+    assert ledger_loaded.state == ledger_with_operations.state
+    assert type(ledger_loaded.state.pot) is PositiveAccount
+    assert ledger_loaded.operations == ledger_with_operations.operations
+    assert Ledger.load_from_file(use_snapshot=False).state == ledger_loaded.state
+
+
+def test__Ledger__load_from_file__outdated_snapshot(ledger, tmp_ledger_file):
+    ledger.save_to_file()
+    # file changed by something else than the ledger: the snapshot is ignored
+    with open(Ledger.LEDGER_FILE, "a") as file:
+        file.write('{"operation": "AddAccount", "name": "kriti"}\n')
+    assert list(Ledger.load_from_file().state) == [
+        "antoine",
+        "baptiste",
+        "renan",
+        "kriti",
+    ]
+
+
+def test__Ledger__load_from_file__corrupt_snapshot(ledger, tmp_ledger_file):
+    ledger.save_to_file()
+    state_file = pathlib.Path(Ledger.LEDGER_FILE).with_suffix(".state.json")
+    file_key = json.loads(state_file.read_text())["ledger_file"]
+    for content in (
+        "{}",
+        "[]",
+        "not json",
+        json.dumps({"ledger_file": file_key, "cents": []}),
+        json.dumps({"ledger_file": file_key, "cents": {"antoine": ["x", 0]}}),
+    ):
+        state_file.write_text(content)
+        assert Ledger.load_from_file().state == ledger.state
+
+
+def test__Ledger__save_to_file__snapshot_not_written(ledger, tmp_ledger_file):
+    # the snapshot cannot replace a directory
+    state_file = pathlib.Path(Ledger.LEDGER_FILE).with_suffix(".state.json")
+    state_file.mkdir()
+    ledger.save_to_file()
+    assert not state_file.with_suffix(".tmp").exists()
+    assert Ledger.load_from_file().state == ledger.state
+
+
+def test__Ledger__save_to_file__snapshot_in_cents(ledger, tmp_ledger_file):
+    ledger.record_shared_expense(amount="0.10", name="antoine", subject="stamp")
+    ledger.save_to_file()
+    state_file = pathlib.Path(Ledger.LEDGER_FILE).with_suffix(".state.json")
+    assert '"antoine":[-10,6]' in state_file.read_text()
+    assert Ledger.load_from_file().state == ledger.state
+
+
+def test__Ledger__load_from_file__blank_lines(tmp_ledger_file):
+    pathlib.Path(Ledger.LEDGER_FILE).write_text(
+        '{"operation":"AddAccount","name":"antoine"}\n'
+        "\n"
+        '{"operation":"AddAccount","name":"baptiste"}\n'
+        "  \n"
+    )
+    assert Ledger.load_from_file().operations == [
+        AddAccount("antoine"),
+        AddAccount("baptiste"),
+    ]
+
+
+def test__Ledger__load_from_file__tags(ledger, tmp_ledger_file):
+    ledger.record_shared_expense(amount=30, name="antoine", subject="potatoes")
+    ledger.apply(SharedExpense(Money(60), "baptiste", "pan", tags=("asset",)))
+    ledger.save_to_file()
+    assert Ledger.load_from_file().operations == ledger.operations
+
+
+def test__Ledger__load_from_file__yaml(tmp_ledger_file):
+    pathlib.Path(Ledger.LEDGER_FILE).with_suffix(".yml").write_text(
+        dedent(
+            """\
+            operation: AddAccount
+            name: antoine
+            ---
+            operation: SharedExpense
+            amount: 30.0
+            payer: antoine
+            subject: pan
+            tags: !!python/tuple
+            - asset
+            """
+        )
+    )
+    assert Ledger.load_from_file().operations[-1] == SharedExpense(
+        Money(30), "antoine", "pan", tags=("asset",)
+    )
+
+
+def test__Ledger__load_from_file__no_file(tmp_ledger_file):
+    with raises(FileNotFoundError):
+        Ledger.load_from_file()
+
+
 def test__Ledger__edit(ledger, tmp_ledger_file):
     ledger.save_to_file()
     with Ledger.edit() as ledger_under_edit:
@@ -329,3 +452,32 @@ def test__Ledger__edit(ledger, tmp_ledger_file):
     ledger_loaded_again = Ledger.load_from_file()
     assert ledger_loaded_again.state == ledger_loaded.state
     assert ledger_loaded_again.operations == ledger_loaded.operations
+
+
+def test__Ledger__edit__append(ledger, tmp_ledger_file):
+    ledger.save_to_file()
+    file = pathlib.Path(Ledger.LEDGER_FILE)
+    saved_content = file.read_text()
+    with Ledger.edit() as ledger_under_edit:
+        ledger_under_edit.record_transfer(10, "antoine", "baptiste")
+    assert file.read_text() == saved_content + (
+        '{"operation":"Transfer","amount":10.0,"sender":"antoine","receiver":"baptiste"}\n'
+    )
+    # removing a saved operation rewrites the file
+    with Ledger.edit() as ledger_under_edit:
+        ledger_under_edit.pop_operation()
+    assert file.read_text() == saved_content
+
+
+def test__Ledger__edit__yaml_file(tmp_ledger_file):
+    pathlib.Path(Ledger.LEDGER_FILE).with_suffix(".yml").write_text(
+        "operation: AddAccount\nname: antoine\n"
+    )
+    with Ledger.edit() as ledger_under_edit:
+        ledger_under_edit.add_account("baptiste")
+    assert pathlib.Path(Ledger.LEDGER_FILE).read_text() == dedent(
+        """\
+        {"operation":"AddAccount","name":"antoine"}
+        {"operation":"AddAccount","name":"baptiste"}
+        """
+    )
@@ -44,6 +44,22 @@ def test__Money__divide():
         Money("6.67"),
     ]
 
+    assert Money(-10).divide_with_no_rest(3) == [
+        Money("-3.34"),
+        Money("-3.33"),
+        Money("-3.33"),
+    ]
+    assert Money("0.05").divide_with_no_rest(2) == [Money("0.03"), Money("0.02")]
+    assert Money("0.07").divide_with_no_rest(2) == [Money("0.03"), Money("0.04")]
+
+
+def test__Money__cents():
+    assert Money("12.34").cents == 1234
+    assert Money(-3).cents == -300
+    assert Money.from_cents(1234) == Money("12.34")
+    assert repr(Money.from_cents(-5)) == "Money('-0.05')"
+    assert repr(Money.from_cents(0)) == "Money('0.00')"
+
 
 def test__Money__add():
     assert Money(9) + Money(3) == Money(12)
@@ -69,3 +85,15 @@ def test__Money__div():
 def test__Money__mul():
     assert Money(9) * Money(3) == Money(27)
     assert type(Money(9) * Money(3)) is Money
+
+
+def test__Money__add__stays_quantized():
+    assert repr(Money(9) + Money("0.5")) == "Money('9.50')"
+    assert repr(Money(9) + 1) == "Money('10.00')"
+    assert repr(Money(9) + Decimal("0.001")) == "Money('9.00')"
+    assert repr(Money(9) - Decimal("0.006")) == "Money('8.99')"
+
+
+def test__Money__from_money():
+    money = Money("3.50")
+    assert Money(money) is money
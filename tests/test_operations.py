@@ -239,6 +239,15 @@ def expenses():
     )
 
 
+def test__SharedExpense__tags__as_list():
+    expense = SharedExpense(
+        amount=Money(30), payer="baptiste", subject="huevos", tags=["animal"]
+    )
+    assert expense.tags == ("animal",)
+    # operations stay hashable
+    hash(expense)
+
+
 def test__SharedExpense__has_tag():
     expense = SharedExpense(
         amount=Money(30),
@@ -254,6 +263,10 @@ def test__Expenses__sum(expenses):
     assert expenses.sum() == Money(75)
 
 
+def test__Expenses__sum__empty():
+    assert repr(Expenses().sum()) == "Money('0.00')"
+
+
 def test__Expenses__select_has_no_tag(expenses):
     assert lpluck_attr("subject", expenses.select_has_no_tag()) == [
         "pimientos",